@@ -2,8 +2,22 @@ import streamlit as st
 import sqlite3
 import pandas as pd
 import os
+import codecs
+import gzip
+import hashlib
+import io
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 from dotenv import load_dotenv
 import google.generativeai as genai
+import ijson
+import orjson
+import pyarrow as pa
+import pyarrow.csv as pacsv
 
 # Load environment variables
 load_dotenv()
@@ -16,84 +30,455 @@ else:
     st.warning("⚠️ GEMINI_API_KEY not found in .env file. AI features will not work.")
 
 # Database Helper Functions
+# Hot statements are kept as constants so the connection's statement cache reuses their prepared plans
+_SQL_INSERT = 'INSERT INTO students (name, student_id, course, gpa, email) VALUES (?, ?, ?, ?, ?)'
+_SQL_SELECT_EXISTING_IDS = 'SELECT student_id FROM students WHERE student_id IN (SELECT value FROM json_each(?))'
+_SQL_SELECT_ALL = 'SELECT * FROM students'
+_SQL_SELECT_IDS = 'SELECT student_id FROM students ORDER BY student_id'
+_SQL_SELECT_ONE = 'SELECT * FROM students WHERE student_id=? LIMIT 1'
+_SQL_UPDATE = 'UPDATE students SET name=?, student_id=?, course=?, gpa=?, email=? WHERE student_id=?'
+_SQL_DELETE = 'DELETE FROM students WHERE student_id=?'
+_SQL_DELETE_MANY = 'DELETE FROM students WHERE student_id IN (SELECT value FROM json_each(?))'
+
+@st.cache_resource
+def get_conn():
+    # One connection per server process, reused across reruns and sessions
+    conn = sqlite3.connect('students.db', check_same_thread=False, isolation_level=None, cached_statements=256)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-20000")
+    conn.execute("PRAGMA mmap_size=268435456")
+    return conn
+
+@st.cache_resource
+def get_db_lock():
+    # Sessions run in separate threads but share the connection above
+    return threading.RLock()
+
+@st.cache_resource
+def _data_version():
+    # Shared by all sessions so a write anywhere invalidates every cached read
+    return [0]
+
+def students_version():
+    return _data_version()[0]
+
+@contextmanager
+def transaction():
+    with get_db_lock():
+        conn = get_conn()
+        changes_before = conn.total_changes
+        conn.execute('BEGIN')
+        try:
+            yield conn
+            conn.execute('COMMIT')
+        except BaseException:
+            # Never leave the shared connection inside an open transaction
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        if conn.total_changes != changes_before:
+            _data_version()[0] += 1
+
 def init_db():
-    conn = sqlite3.connect('students.db')
-    c = conn.cursor()
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS students (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            student_id TEXT UNIQUE NOT NULL,
-            course TEXT,
-            gpa REAL,
-            email TEXT
-        )
-    ''')
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS students (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                student_id TEXT UNIQUE NOT NULL,
+                course TEXT,
+                gpa REAL,
+                email TEXT
+            )
+        ''')
+        # Lookups by student_id are served by the UNIQUE constraint's implicit index
 
 def add_student(name, student_id, course, gpa, email):
     try:
-        conn = sqlite3.connect('students.db')
-        c = conn.cursor()
-        c.execute('INSERT INTO students (name, student_id, course, gpa, email) VALUES (?, ?, ?, ?, ?)',
-                  (name, student_id, course, gpa, email))
-        conn.commit()
-        conn.close()
+        with transaction() as conn:
+            conn.execute(_SQL_INSERT, (name, student_id, course, gpa, email))
         return True, "Student added successfully!"
     except sqlite3.IntegrityError:
         return False, "Error: Student ID already exists."
     except Exception as e:
         return False, f"Error: {e}"
 
+_SQL_SCALARS = (str, int, float, type(None))
+
+def _insert_batch(conn, rows, errors):
+    c = conn.cursor()
+    # Classify conflicts with one set-based lookup instead of relying on IntegrityError per row
+    c.execute(_SQL_SELECT_EXISTING_IDS, (json.dumps([row[1] for row in rows]),))
+    existing = {r[0] for r in c.fetchall()}
+
+    to_insert = []
+    for row in rows:
+        name, s_id = row[0], row[1]
+        if s_id in existing:
+            errors.append(f"{name} ({s_id}): Error: Student ID already exists.")
+        else:
+            existing.add(s_id)
+            to_insert.append(row)
+
+    c.execute('SAVEPOINT import_batch')
+    try:
+        c.executemany(_SQL_INSERT, to_insert)
+        c.execute('RELEASE import_batch')
+        return len(to_insert)
+    except (sqlite3.Error, OverflowError):
+        c.execute('ROLLBACK TO import_batch')
+        c.execute('RELEASE import_batch')
+
+    # Fall back to one row at a time so a single bad record cannot drop its neighbours.
+    # A failed INSERT only undoes its own statement, not the surrounding transaction.
+    success_count = 0
+    for row in to_insert:
+        try:
+            c.execute(_SQL_INSERT, row)
+            success_count += 1
+        except sqlite3.IntegrityError:
+            errors.append(f"{row[0]} ({row[1]}): Error: Student ID already exists.")
+        except (sqlite3.Error, OverflowError) as e:
+            errors.append(f"{row[0]} ({row[1]}): Error: {e}")
+    return success_count
+
+def add_students_bulk(records, batch_size=500):
+    """Insert records from any iterable in batches of batch_size, all in one transaction.
+
+    An exception raised while iterating (e.g. a malformed file) rolls back the whole import.
+    """
+    success_count = 0
+    rows = []
+    errors = []
+    with transaction() as conn:
+        for student in records:
+            # Basic validation
+            row = None
+            if isinstance(student, dict) and all(student.get(k) is not None for k in ("name", "student_id")):
+                row = (
+                    student.get("name"),
+                    # The column has TEXT affinity, so compare and store IDs as strings
+                    str(student.get("student_id")),
+                    student.get("course", "Other"),
+                    student.get("gpa", 0.0),
+                    student.get("email", ""),
+                )
+            # Nested objects or lists cannot be bound by SQLite and would fail the whole batch
+            if row is not None and all(isinstance(v, _SQL_SCALARS) for v in row):
+                rows.append(row)
+            else:
+                errors.append(f"Skipped invalid record: {student}")
+
+            if len(rows) >= batch_size:
+                success_count += _insert_batch(conn, rows, errors)
+                rows = []
+
+        if rows:
+            success_count += _insert_batch(conn, rows, errors)
+    return success_count, errors
+
+@st.cache_data(ttl=None, max_entries=8, show_spinner=False)
+def _load_students_cached(version):
+    with get_db_lock():
+        return pd.read_sql_query(_SQL_SELECT_ALL, get_conn(), dtype_backend='pyarrow')
+
 def get_all_students():
-    conn = sqlite3.connect('students.db')
-    df = pd.read_sql_query("SELECT * FROM students", conn)
-    conn.close()
-    return df
+    return _load_students_cached(students_version())
+
+@st.cache_data(ttl=None, max_entries=8, show_spinner=False)
+def _load_student_ids_cached(version):
+    with get_db_lock():
+        return [r[0] for r in get_conn().execute(_SQL_SELECT_IDS).fetchall()]
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _export_payloads(version):
+    df = _load_students_cached(version)
+    if df.empty:
+        return None
+    buf = io.BytesIO()
+    pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), buf)
+    json_bytes = orjson.dumps(df.to_dict('records'), option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    # compresslevel=1 keeps compression cheap while still shrinking tabular text several-fold
+    return gzip.compress(buf.getvalue(), compresslevel=1), gzip.compress(json_bytes, compresslevel=1)
+
+def get_export_payloads():
+    """Gzipped CSV and JSON exports, rebuilt only when the data changes."""
+    return _export_payloads(students_version())
+
+def get_student_ids():
+    return _load_student_ids_cached(students_version())
+
+def get_student(student_id):
+    with get_db_lock():
+        cur = get_conn().execute(_SQL_SELECT_ONE, (student_id,))
+        row = cur.fetchone()
+    if row is None:
+        return None
+    return dict(zip([col[0] for col in cur.description], row))
+
+@st.cache_data(ttl=None, max_entries=64, show_spinner=False)
+def _search_students_cached(term, version):
+    # Vectorised Arrow string kernels on the cached frame; unlike SQLite's LIKE they fold non-ASCII case too
+    df = _load_students_cached(version)
+    mask = (df['name'].str.contains(term, case=False, regex=False)
+            | df['student_id'].str.contains(term, case=False, regex=False))
+    return df[mask.fillna(False)]
+
+def search_students(term):
+    if not term:
+        return get_all_students()
+    return _search_students_cached(term, students_version())
 
 def update_student(original_student_id, name, student_id, course, gpa, email):
     try:
-        conn = sqlite3.connect('students.db')
-        c = conn.cursor()
-        c.execute('''
-            UPDATE students 
-            SET name=?, student_id=?, course=?, gpa=?, email=?
-            WHERE student_id=?
-        ''', (name, student_id, course, gpa, email, original_student_id))
-        conn.commit()
-        conn.close()
+        with transaction() as conn:
+            conn.execute(_SQL_UPDATE, (name, student_id, course, gpa, email, original_student_id))
         return True, "Student updated successfully!"
     except Exception as e:
         return False, f"Error: {e}"
 
 def delete_student(student_id):
     try:
-        conn = sqlite3.connect('students.db')
-        c = conn.cursor()
-        c.execute('DELETE FROM students WHERE student_id=?', (student_id,))
-        conn.commit()
-        conn.close()
+        with transaction() as conn:
+            conn.execute(_SQL_DELETE, (student_id,))
         return True, "Student deleted successfully!"
     except Exception as e:
         return False, f"Error: {e}"
 
+def delete_students_bulk(student_ids):
+    try:
+        with transaction() as conn:
+            # One statement and one plan for any number of IDs
+            cur = conn.execute(_SQL_DELETE_MANY, (json.dumps(list(student_ids)),))
+        return True, f"Deleted {cur.rowcount} students."
+    except Exception as e:
+        return False, f"Error: {e}"
+
+def clear_all_students():
+    try:
+        with transaction() as conn:
+            conn.execute('DELETE FROM students')
+    except Exception as e:
+        return False, f"Error: {e}"
+    # Return the freed pages to the filesystem; VACUUM cannot run inside a transaction.
+    # The rows are already gone, so a busy database here is not worth reporting.
+    try:
+        with get_db_lock():
+            get_conn().execute('VACUUM')
+    except sqlite3.Error:
+        pass
+    return True, "All data deleted successfully."
+
+# Import Helper Functions
+class _Utf8Reader:
+    """Transcodes a binary stream to UTF-8 on the fly, since ijson only parses UTF-8."""
+
+    def __init__(self, raw, encoding):
+        self._raw = raw
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+
+    def read(self, size=-1):
+        while True:
+            chunk = self._raw.read(size)
+            text = self._decoder.decode(chunk, final=not chunk)
+            if text or not chunk:
+                return text.encode('utf-8')
+
+def _open_raw(uploaded_file):
+    # Accept the gzip-compressed exports as well as plain JSON
+    uploaded_file.seek(0)
+    is_gzip = uploaded_file.read(2) == b'\x1f\x8b'
+    uploaded_file.seek(0)
+    return gzip.GzipFile(fileobj=uploaded_file) if is_gzip else uploaded_file
+
+def open_json_stream(uploaded_file):
+    encoding = json.detect_encoding(_open_raw(uploaded_file).read(4))
+    raw = _open_raw(uploaded_file)
+    if encoding == 'utf-8':
+        return raw
+    return _Utf8Reader(raw, encoding)
+
+def import_students_json(uploaded_file):
+    try:
+        return add_students_bulk(ijson.items(open_json_stream(uploaded_file), 'item', use_float=True))
+    except ijson.JSONError as e:
+        if 'integer overflow' not in str(e):
+            raise
+    # yajl's C parser is limited to 64-bit integers; the pure-Python backend is not
+    records = ijson.get_backend('python').items(open_json_stream(uploaded_file), 'item', use_float=True)
+    return add_students_bulk(records)
+
 # AI Helper Functions
+@st.cache_resource
+def _get_model():
+    # Reused across calls so the client and its transport are set up only once
+    return genai.GenerativeModel('gemini-2.5-flash')
+
+class _ResponseCache:
+    """LRU of model responses, filled after the fact so streamed replies can be cached too."""
+
+    def __init__(self, max_entries, ttl):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+        self._ttl = ttl
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > self._ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, response):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+@st.cache_resource
+def _response_cache():
+    return _ResponseCache(max_entries=256, ttl=3600)
+
+def _response_key(prompt):
+    # Answers go stale as soon as the student data changes
+    return hashlib.blake2b(prompt.encode(), digest_size=16).hexdigest(), students_version()
+
 def get_gemini_response(prompt):
     if not api_key:
         return "⚠️ API Key missing. Please configure .env file."
     try:
-        model = genai.GenerativeModel('gemini-2.5-flash')
-        response = model.generate_content(prompt)
-        return response.text
+        key = _response_key(prompt)
+        response = _response_cache().get(key)
+        if response is None:
+            response = _get_model().generate_content(prompt).text
+            _response_cache().put(key, response)
+        return response
     except Exception as e:
         return f"Error communicating with Gemini: {e}"
 
-def get_student_context():
-    df = get_all_students()
-    if df.empty:
+def stream_gemini_response(prompt):
+    if not api_key:
+        yield "⚠️ API Key missing. Please configure .env file."
+        return
+    key = _response_key(prompt)
+    response = _response_cache().get(key)
+    if response is not None:
+        yield response
+        return
+    parts = []
+    try:
+        for chunk in _get_model().generate_content(prompt, stream=True):
+            parts.append(chunk.text)
+            yield chunk.text
+    except Exception as e:
+        yield f"Error communicating with Gemini: {e}"
+        return
+    _response_cache().put(key, ''.join(parts))
+
+def render_stream(chunks, interval=0.05, max_pending=32):
+    """Render streamed text, repainting at most every `interval` seconds or `max_pending` chunks."""
+    placeholder = st.empty()
+    parts = []
+    pending = 0
+    last_paint = time.monotonic()
+    for chunk in chunks:
+        parts.append(chunk)
+        pending += 1
+        now = time.monotonic()
+        if pending >= max_pending or now - last_paint >= interval:
+            placeholder.markdown(''.join(parts))
+            pending = 0
+            last_paint = now
+    response = ''.join(parts)
+    placeholder.markdown(response)
+    return response
+
+def _tokens(text):
+    return tuple(re.findall(r"\w+", str(text).lower()))
+
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _student_index(version):
+    """Token lookup tables for spotting students in a question, built once per data version."""
+    exact = {}    # full name or ID as a token tuple -> student IDs
+    partial = {}  # single name part -> student IDs
+    with get_db_lock():
+        keys = get_conn().execute('SELECT student_id, name FROM students').fetchall()
+    for s_id, name in keys:
+        # Empty or punctuation-only names and IDs have no tokens and can never match
+        for key in {_tokens(s_id), _tokens(name)}:
+            if key:
+                exact.setdefault(key, []).append(s_id)
+        for part in set(_tokens(name)):
+            if len(part) > 2:
+                partial.setdefault(part, []).append(s_id)
+    longest = max((len(key) for key in exact), default=0)
+    return exact, partial, longest
+
+@st.cache_data(ttl=None, max_entries=8, show_spinner=False)
+def _summary_context(version):
+    with get_db_lock():
+        conn = get_conn()
+        total = conn.execute('SELECT COUNT(*) FROM students').fetchone()[0]
+        if total == 0:
+            return None
+        by_course = pd.read_sql_query('''
+            SELECT course, COUNT(*) AS students, ROUND(AVG(gpa), 2) AS avg_gpa, MIN(gpa) AS min_gpa, MAX(gpa) AS max_gpa
+            FROM students GROUP BY course ORDER BY course
+        ''', conn)
+        top = pd.read_sql_query('SELECT name, student_id, course, gpa FROM students ORDER BY gpa DESC LIMIT 10', conn)
+    return (f"Total students: {total}\n\n"
+            f"GPA statistics by course:\n{by_course.to_csv(index=False)}\n"
+            f"Top 10 students by GPA:\n{top.to_csv(index=False)}")
+
+@st.cache_data(ttl=None, max_entries=128, show_spinner=False)
+def _student_context_cached(question, version):
+    summary = _summary_context(version)
+    if summary is None:
         return "No student data available."
-    return df.to_string(index=False)
+
+    # Route questions about specific students to their full records
+    exact, partial, longest = _student_index(version)
+    words = _tokens(question)
+    # Whole-token matches, so short names like "Ed" do not hit inside "improved"
+    mentioned = {}
+    for n in range(1, min(longest, len(words)) + 1):
+        for i in range(len(words) - n + 1):
+            mentioned.update(dict.fromkeys(exact.get(words[i:i + n], ())))
+    # Exact hits come first, but a spurious one must not hide the name-part matches
+    for word in words:
+        mentioned.update(dict.fromkeys(partial.get(word, ())))
+    mentioned = list(mentioned)[:20]
+    if not mentioned:
+        return summary
+
+    with get_db_lock():
+        records = pd.read_sql_query(
+            f"SELECT * FROM students WHERE student_id IN ({','.join('?' * len(mentioned))})",
+            get_conn(), params=mentioned)
+    return f"Records of students mentioned in the question:\n{records.to_csv(index=False)}\n{summary}"
+
+def get_student_context(question):
+    return _student_context_cached(question, students_version())
+
+@st.cache_data(ttl=None, max_entries=64, show_spinner=False)
+def _cohort_stats_cached(course, gpa, version):
+    with get_db_lock():
+        conn = get_conn()
+        course_avg, course_count = conn.execute('SELECT AVG(gpa), COUNT(*) FROM students WHERE course=?', (course,)).fetchone()
+        rank, total = conn.execute('SELECT 1 + COUNT(*) FILTER (WHERE gpa > ?), COUNT(*) FROM students', (gpa,)).fetchone()
+    return course_avg, course_count, rank, total
+
+def get_cohort_stats(course, gpa):
+    """Course average and overall GPA rank, so the model gets the comparison without extra prompts."""
+    return _cohort_stats_cached(course, gpa, students_version())
 
 # Page Configuration
 st.set_page_config(page_title="Student Management System", page_icon="🎓", layout="wide")
@@ -138,36 +523,17 @@ with tab1:
 
     # JSON Import Section
     with st.expander("📂 Import Students from JSON", expanded=False):
-        uploaded_file = st.file_uploader("Upload JSON file", type=['json'])
+        uploaded_file = st.file_uploader("Upload JSON file (.json or .json.gz)", type=['json', 'gz'])
         if uploaded_file is not None:
             try:
-                import json
-                data = json.load(uploaded_file)
-                if isinstance(data, list):
-                    success_count = 0
-                    error_count = 0
-                    errors = []
-                    
+                # Only the first token is parsed here; records are streamed on import
+                first_event = next(ijson.parse(open_json_stream(uploaded_file)), None)
+                if first_event is not None and first_event[1] == 'start_array':
                     if st.button("Import Data"):
-                        for student in data:
-                            # Basic validation
-                            if all(k in student for k in ("name", "student_id")):
-                                s_name = student.get("name")
-                                s_id = student.get("student_id")
-                                s_course = student.get("course", "Other")
-                                s_gpa = student.get("gpa", 0.0)
-                                s_email = student.get("email", "")
-                                
-                                success, msg = add_student(s_name, s_id, s_course, s_gpa, s_email)
-                                if success:
-                                    success_count += 1
-                                else:
-                                    error_count += 1
-                                    errors.append(f"{s_name} ({s_id}): {msg}")
-                            else:
-                                error_count += 1
-                                errors.append(f"Skipped invalid record: {student}")
-                        
+                        # A parse error rolls back the whole import and is reported below as a file error
+                        success_count, errors = import_students_json(uploaded_file)
+                        error_count = len(errors)
+
                         if success_count > 0:
                             st.success(f"Successfully imported {success_count} students.")
                         if error_count > 0:
@@ -185,161 +551,174 @@ with tab1:
     # Export Section
     st.markdown("### 📤 Export Data")
     col_exp1, col_exp2 = st.columns(2)
-    df = get_all_students()
-    if not df.empty:
+    payloads = get_export_payloads()
+    if payloads is not None:
+        csv_gz, json_gz = payloads
         with col_exp1:
-            csv = df.to_csv(index=False).encode('utf-8')
             st.download_button(
-                label="Download as CSV",
-                data=csv,
-                file_name='students.csv',
-                mime='text/csv',
+                label="Download as CSV (gzip)",
+                data=csv_gz,
+                file_name='students.csv.gz',
+                mime='application/gzip',
             )
         with col_exp2:
-            json_str = df.to_json(orient='records', indent=4)
             st.download_button(
-                label="Download as JSON",
-                data=json_str,
-                file_name='students.json',
-                mime='application/json',
+                label="Download as JSON (gzip)",
+                data=json_gz,
+                file_name='students.json.gz',
+                mime='application/gzip',
             )
 
     # View/Edit/Delete Section
-    st.subheader("Student Records")
-    
-    # Search/Filter
-    search_term = st.text_input("🔍 Search by Name or ID", "")
-    
-    df = get_all_students()
-    
-    if not df.empty:
-        if search_term:
-            df = df[df['name'].str.contains(search_term, case=False) | df['student_id'].str.contains(search_term, case=False)]
+    @st.fragment
+    def records_panel():
+        st.subheader("Student Records")
         
-        # Display Data
-        st.dataframe(df, use_container_width=True, hide_index=True)
+        # Search/Filter
+        search_term = st.text_input("🔍 Search by Name or ID", "")
         
-        # Edit/Delete Actions
-        st.markdown("### Actions")
-        col_action1, col_action2 = st.columns(2)
+        # Looked up here rather than passed in: fragment reruns reuse the arguments of the last full run
+        df = search_students(search_term)
         
-        with col_action1:
-            st.markdown("#### ✏️ Update Student")
-            student_to_edit = st.selectbox("Select Student to Edit", df['student_id'].tolist(), key="edit_select")
-            if student_to_edit:
-                student_data = df[df['student_id'] == student_to_edit].iloc[0]
-                with st.form("edit_student_form"):
-                    edit_name = st.text_input("Name", value=student_data['name'])
-                    edit_id = st.text_input("Student ID", value=student_data['student_id'])
-                    edit_course = st.selectbox("Course", ["Computer Science", "Engineering", "Business", "Arts", "Science", "Other"], index=["Computer Science", "Engineering", "Business", "Arts", "Science", "Other"].index(student_data['course']) if student_data['course'] in ["Computer Science", "Engineering", "Business", "Arts", "Science", "Other"] else 0)
-                    edit_gpa = st.number_input("GPA", min_value=0.0, max_value=4.0, step=0.1, value=float(student_data['gpa']))
-                    edit_email = st.text_input("Email", value=student_data['email'])
-                    
-                    if st.form_submit_button("Update Student"):
-                        success, msg = update_student(student_to_edit, edit_name, edit_id, edit_course, edit_gpa, edit_email)
-                        if success:
-                            st.success(msg)
-                            st.rerun()
-                        else:
-                            st.error(msg)
-
-        with col_action2:
-            st.markdown("#### 🗑️ Delete Student")
-            student_to_delete = st.selectbox("Select Student to Delete", df['student_id'].tolist(), key="delete_select")
-            if st.button("Delete Student", type="primary"):
-                success, msg = delete_student(student_to_delete)
-                if success:
-                    st.success(msg)
-                    st.rerun()
-                else:
-                    st.error(msg)
-        
-        # Clear All Data
-        st.divider()
-        with st.expander("⚠️ Danger Zone"):
-            st.markdown("### Clear All Data")
-            st.warning("This action cannot be undone.")
-            if st.button("Clear All Student Data", type="primary"):
-                st.session_state.confirm_clear = True
+        if not df.empty:
+            # Display Data
+            st.dataframe(df, use_container_width=True, hide_index=True)
+            
+            ids = df['student_id'].to_numpy()
+            by_id = df.set_index('student_id', drop=False)
+            
+            # Edit/Delete Actions
+            st.markdown("### Actions")
+            col_action1, col_action2 = st.columns(2)
+            
+            with col_action1:
+                st.markdown("#### ✏️ Update Student")
+                student_to_edit = st.selectbox("Select Student to Edit", ids, key="edit_select")
+                if student_to_edit:
+                    student_data = by_id.loc[student_to_edit]
+                    with st.form("edit_student_form"):
+                        edit_name = st.text_input("Name", value=student_data['name'])
+                        edit_id = st.text_input("Student ID", value=student_data['student_id'])
+                        edit_course = st.selectbox("Course", ["Computer Science", "Engineering", "Business", "Arts", "Science", "Other"], index=["Computer Science", "Engineering", "Business", "Arts", "Science", "Other"].index(student_data['course']) if pd.notna(student_data['course']) and student_data['course'] in ["Computer Science", "Engineering", "Business", "Arts", "Science", "Other"] else 0)
+                        edit_gpa = st.number_input("GPA", min_value=0.0, max_value=4.0, step=0.1, value=float(student_data['gpa']) if pd.notna(student_data['gpa']) else 0.0)
+                        edit_email = st.text_input("Email", value=student_data['email'] if pd.notna(student_data['email']) else "")
+                        
+                        if st.form_submit_button("Update Student"):
+                            success, msg = update_student(student_to_edit, edit_name, edit_id, edit_course, edit_gpa, edit_email)
+                            if success:
+                                st.success(msg)
+                                st.rerun()
+                            else:
+                                st.error(msg)
+
+            with col_action2:
+                st.markdown("#### 🗑️ Delete Student")
+                student_to_delete = st.selectbox("Select Student to Delete", ids, key="delete_select")
+                if st.button("Delete Student", type="primary"):
+                    success, msg = delete_student(student_to_delete)
+                    if success:
+                        st.success(msg)
+                        st.rerun()
+                    else:
+                        st.error(msg)
             
-            if st.session_state.get("confirm_clear"):
-                st.error("Are you sure you want to delete ALL students?")
-                col_confirm1, col_confirm2 = st.columns(2)
-                with col_confirm1:
-                    if st.button("Yes, Delete Everything"):
-                        try:
-                            conn = sqlite3.connect('students.db')
-                            c = conn.cursor()
-                            c.execute('DELETE FROM students')
-                            conn.commit()
-                            conn.close()
-                            st.success("All data deleted successfully.")
+            # Clear All Data
+            st.divider()
+            with st.expander("⚠️ Danger Zone"):
+                st.markdown("### Clear All Data")
+                st.warning("This action cannot be undone.")
+                if st.button("Clear All Student Data", type="primary"):
+                    st.session_state.confirm_clear = True
+                
+                if st.session_state.get("confirm_clear"):
+                    st.error("Are you sure you want to delete ALL students?")
+                    col_confirm1, col_confirm2 = st.columns(2)
+                    with col_confirm1:
+                        if st.button("Yes, Delete Everything"):
+                            success, msg = clear_all_students()
+                            if success:
+                                st.success(msg)
+                                st.session_state.confirm_clear = False
+                                st.rerun()
+                            else:
+                                st.error(msg)
+                    with col_confirm2:
+                        if st.button("Cancel"):
                             st.session_state.confirm_clear = False
                             st.rerun()
-                        except Exception as e:
-                            st.error(f"Error: {e}")
-                with col_confirm2:
-                    if st.button("Cancel"):
-                        st.session_state.confirm_clear = False
-                        st.rerun()
-    else:
-        st.info("No students found. Add some students to get started.")
+        elif search_term:
+            st.info("No students match your search.")
+        else:
+            st.info("No students found. Add some students to get started.")
+
+    records_panel()
 
 # Tab 2: AI Advisor
 with tab2:
     st.header("🤖 AI Advisor")
     
     # Chat Interface
-    st.subheader("💬 Ask about your data")
-    
-    if "messages" not in st.session_state:
-        st.session_state.messages = []
-
-    for message in st.session_state.messages:
-        with st.chat_message(message["role"]):
-            st.markdown(message["content"])
-
-    if prompt := st.chat_input("Ask a question (e.g., 'Who has the highest GPA?')"):
-        st.session_state.messages.append({"role": "user", "content": prompt})
-        with st.chat_message("user"):
-            st.markdown(prompt)
-
-        with st.chat_message("assistant"):
-            with st.spinner("Thinking..."):
-                context = get_student_context()
-                full_prompt = f"""
-                You are a helpful assistant for a Student Management System.
-                Here is the current student data in CSV format:
-                
-                {context}
-                
-                User Question: {prompt}
-                
-                Answer based on the data provided. If the data is empty, say so.
-                Keep the answer concise and professional.
-                """
-                response = get_gemini_response(full_prompt)
-                st.markdown(response)
+    @st.fragment
+    def chat_panel():
+        st.subheader("💬 Ask about your data")
+        
+        if "messages" not in st.session_state:
+            st.session_state.messages = []
+
+        for message in st.session_state.messages:
+            with st.chat_message(message["role"]):
+                st.markdown(message["content"])
+
+        if prompt := st.chat_input("Ask a question (e.g., 'Who has the highest GPA?')"):
+            st.session_state.messages.append({"role": "user", "content": prompt})
+            with st.chat_message("user"):
+                st.markdown(prompt)
+
+            with st.chat_message("assistant"):
+                with st.spinner("Thinking..."):
+                    context = get_student_context(prompt)
+                    full_prompt = f"""
+                    You are a helpful assistant for a Student Management System.
+                    Here is a summary of the current student data, with tables in CSV format:
+                    
+                    {context}
+                    
+                    User Question: {prompt}
+                    
+                    Answer based on the data provided. If the data is empty, say so.
+                    Keep the answer concise and professional.
+                    """
+                response = render_stream(stream_gemini_response(full_prompt))
                 st.session_state.messages.append({"role": "assistant", "content": response})
 
+    chat_panel()
+
     st.divider()
     
     # Performance Summary
     st.subheader("📝 Performance Summary Generator")
     
-    df = get_all_students()
-    if not df.empty:
-        selected_student_id = st.selectbox("Select Student for Review", df['student_id'].tolist(), key="summary_select")
+    ids = get_student_ids()
+    if ids:
+        selected_student_id = st.selectbox("Select Student for Review", ids, key="summary_select")
         if st.button("Generate Performance Review"):
-            student_data = df[df['student_id'] == selected_student_id].iloc[0]
+            student_data = get_student(selected_student_id)
             with st.spinner(f"Generating review for {student_data['name']}..."):
+                course_avg, course_count, rank, total = get_cohort_stats(student_data['course'], student_data['gpa'])
+                cohort_lines = []
+                if course_avg is not None:
+                    cohort_lines.append(f"Course average GPA: {course_avg:.2f} ({course_count} students)")
+                if student_data['gpa'] is not None:
+                    cohort_lines.append(f"GPA rank: {rank}/{total}")
+                cohort = "\n                ".join(cohort_lines)
                 review_prompt = f"""
                 Write a personalized performance review and study plan for the following student:
                 Name: {student_data['name']}
                 Course: {student_data['course']}
                 GPA: {student_data['gpa']}
+                {cohort}
                 
-                The review should be encouraging but honest. Suggest study tips based on their GPA.
+                The review should be encouraging but honest. Suggest study tips based on their GPA and how it compares to their peers.
                 """
                 review = get_gemini_response(review_prompt)
                 st.markdown("### Performance Review")